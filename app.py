@@ -1,7 +1,10 @@
 import streamlit as st
 import random
+import html
 from pathlib import Path
-from datetime import date, timedelta
+from datetime import date, time as dt_time, timedelta
+from static_assets import start_asset_server
+import plan_store
 
 BASE_DIR = Path(__file__).parent
 IMAGES_DIR = BASE_DIR / "images"
@@ -24,6 +27,22 @@ def book_button(label, key, plan=None, filters=None):
             st.session_state.booking_day = filters.get("day")
             st.session_state.booking_time = filters.get("time")
 
+        # Store the booking so the checkout URL can be refreshed or shared.
+        # Day and time go in as ISO strings and are parsed back on restore.
+        day = st.session_state.get("booking_day")
+        time = st.session_state.get("booking_time")
+        booking_id = plan_store.put({
+            "plan": st.session_state.get("selected_plan"),
+            "filters": plan_filters(st.session_state.get("filters_to_use", {})),
+            "people": st.session_state.get("booking_people"),
+            "day": day.isoformat() if day else None,
+            "time": time.isoformat() if time else None,
+            "home_plan_id": st.session_state.get("plan_id"),
+        })
+        st.session_state.booking_id = booking_id
+        st.session_state.home_plan_id = st.session_state.get("plan_id")
+        st.query_params.from_dict({"page": "checkout", "plan": booking_id})
+
         st.session_state.page = "checkout"
         st.rerun()
 
@@ -98,6 +117,27 @@ activity_images = [str(IMAGES_DIR / f"activity{i}.jpg") for i in range(1, 7)]
 restaurant_images = [str(IMAGES_DIR / f"restaurant{i}.jpg") for i in range(1, 7)]
 combo_images = [str(IMAGES_DIR / f"combo{i}.jpg") for i in range(1, 7)]
 
+# Serve the fixed pools as long-cached static assets so a rerun only sends URLs.
+# The raw <img> trades away st.image's fullscreen button for that caching.
+# None unless ACTIVITYCITY_ASSET_URL is set (see static_assets.py)
+@st.cache_resource
+def asset_server():
+    """One asset server per process, kept across reruns and module reloads."""
+    server = start_asset_server()
+    if server is not None:
+        server.register(activity_images + restaurant_images + combo_images)
+    return server
+
+def show_image(path, alt=None):
+    """Render an image via its content-hashed URL, falling back to st.image."""
+    server = asset_server()
+    url = server.url(path) if server else None
+    if url is None:
+        st.image(path, use_container_width=True)
+        return
+    alt = html.escape(alt or Path(path).stem)
+    st.markdown(f'<img src="{url}" alt="{alt}" style="width: 100%;">', unsafe_allow_html=True)
+
 # Example allergens
 allergens_list = ["Gluten", "Dairy", "Nuts", "Shellfish", "Soy", "Eggs", "Sesame"]
 
@@ -365,6 +405,45 @@ def generate_plan(filters):
 
     return featured, explore_more
 
+# Only these filters change what generate_plan returns
+PLAN_FILTER_KEYS = ("type", "occasion", "vibe", "food_pref", "allergens")
+
+def plan_filters(filters):
+    """The part of a filters dict that generate_plan depends on."""
+    return {k: filters.get(k) for k in PLAN_FILTER_KEYS}
+
+# A plan opened from a link is kept until the user changes a filter (or friends)
+# in this session. Its stored filters are copied into filters_to_use so it
+# renders and books the way the sharer saw it.
+def load_or_generate_plan(filters, filters_to_use):
+    """Serve the plan in ?plan=<id>, otherwise generate one and put its ID in the URL."""
+    filters_id = plan_store.content_id(plan_filters(filters_to_use))
+    plan_id = st.query_params.get("plan")
+    entry = plan_store.get(plan_id)
+    if entry and "featured" in entry:
+        opened_link = plan_id != st.session_state.get("plan_id")
+        if opened_link or filters_id == st.session_state.get("plan_filters_id"):
+            st.session_state.plan_id = plan_id
+            st.session_state.plan_filters_id = filters_id
+            filters_to_use.update(entry["filters_to_use"])
+            return entry["featured"], entry["explore_more"]
+
+    featured, explore_more = generate_plan(filters_to_use)
+    st.session_state.plan_filters_id = filters_id
+    if featured:
+        plan_id = plan_store.put({
+            "filters": plan_filters(filters),
+            "filters_to_use": plan_filters(filters_to_use),
+            "featured": featured,
+            "explore_more": explore_more,
+        })
+        st.session_state.plan_id = plan_id
+        st.query_params.from_dict({"plan": plan_id})
+    else:
+        st.session_state.plan_id = None
+        st.query_params.clear()
+    return featured, explore_more
+
 if "friends" not in st.session_state:
     st.session_state.friends = []
 
@@ -405,7 +484,7 @@ def friend_preferences():
 def best_match():
     st.subheader("✨ Your Group's Perfect Day")
     st.write("Based on everyone's preferences, here’s what we think you'll love:")
-    st.image(random.choice(combo_images), use_container_width=True)
+    show_image(random.choice(combo_images))
     st.markdown("**Activity:** " + random.choice([a["name"] for a in activities]))
     st.markdown("**Restaurant:** " + random.choice([r["name"] for r in restaurants]))
     if st.button("Confirm & Book"):
@@ -424,6 +503,35 @@ if "page" not in st.session_state:
 if "friends" not in st.session_state:
     st.session_state.friends = []
 
+# Permalinks - ?page=checkout&plan=<id> opens a stored booking directly
+link_expired = False
+if st.query_params.get("page") == "checkout" and st.query_params.get("plan") != st.session_state.get("booking_id"):
+    booking = plan_store.get(st.query_params.get("plan"))
+    if booking:
+        st.session_state.selected_plan = booking["plan"]
+        st.session_state.filters_to_use = booking["filters"]
+        # Unset values stay unset so checkout falls back to its own defaults
+        if booking["people"] is not None:
+            st.session_state.booking_people = booking["people"]
+        if booking["day"] is not None:
+            st.session_state.booking_day = date.fromisoformat(booking["day"])
+        if booking["time"] is not None:
+            st.session_state.booking_time = dt_time.fromisoformat(booking["time"])
+        st.session_state.booking_id = st.query_params.get("plan")
+        st.session_state.home_plan_id = booking.get("home_plan_id")
+        st.session_state.page = "checkout"
+    else:
+        link_expired = True
+        st.session_state.page = "home"
+        st.query_params.clear()
+
+# Permalinks - ?plan=<id> opens a shared plan with the filters it was made for
+elif st.query_params.get("plan") and st.query_params.get("plan") != st.session_state.get("plan_id"):
+    entry = plan_store.get(st.query_params.get("plan"))
+    if entry and "featured" in entry:
+        for k, v in entry["filters"].items():
+            st.session_state[f"filter_{k}"] = v
+
 # Hero with gradient background & styled text
 st.markdown(
     """
@@ -435,6 +543,9 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+if link_expired:
+    st.warning("This booking link has expired. Here are some fresh ideas instead.")
+
 # Filters
 st.subheader("🔍 Find Your Perfect Day")
 cols = st.columns(5)
@@ -442,13 +553,13 @@ city = cols[0].selectbox("City", ["San Francisco", "Los Angeles", "New York"])
 people = cols[1].number_input("People", 1, 20, 2)
 day = cols[2].date_input("Day", date.today())
 time = cols[3].time_input("Time", key="filter_time")
-atype = cols[4].selectbox("Type", ["Activity + Food","Activity", "Food"])
+atype = cols[4].selectbox("Type", ["Activity + Food","Activity", "Food"], key="filter_type")
 
 with st.expander("More Filters"):
-    occasion = st.selectbox("Occasion", ["Any", "Birthday", "Date Night", "Team Event"])
-    vibe = st.selectbox("Vibe", ["Any", "Fun", "Relaxed", "Competitive", "Romantic"])
-    food_pref = st.selectbox("Food Preference", ["Any", "Vegetarian-friendly", "Vegan-friendly", "Seafood", "Meat Lover"])
-    allergens = st.multiselect("Allergens", allergens_list)
+    occasion = st.selectbox("Occasion", ["Any", "Birthday", "Date Night", "Team Event"], key="filter_occasion")
+    vibe = st.selectbox("Vibe", ["Any", "Fun", "Relaxed", "Competitive", "Romantic"], key="filter_vibe")
+    food_pref = st.selectbox("Food Preference", ["Any", "Vegetarian-friendly", "Vegan-friendly", "Seafood", "Meat Lover"], key="filter_food_pref")
+    allergens = st.multiselect("Allergens", allergens_list, key="filter_allergens")
     walk_dist = st.slider("Max Walking Distance (mins)", 1, 15, 5)
 
 filters = {
@@ -543,7 +654,7 @@ if st.session_state.page == "home":
 
 
 
-        featured, explore_more = generate_plan(filters_to_use)
+        featured, explore_more = load_or_generate_plan(filters, filters_to_use)
         
         # Save filters_to_use in session_state
     
@@ -564,7 +675,7 @@ if st.session_state.page == "home":
         if filters_to_use["type"] == "Activity":
             left_col, right_col = st.columns([1, 2])
             with left_col:
-                st.image(featured["activity_img"], use_container_width=True, width=250)
+                show_image(featured["activity_img"], alt=featured["activity"])
             with right_col:
                 st.markdown(f"### 🏆 {featured['activity']}")
                 st.markdown(f"**🎯 Match:** {match_pct}% ")
@@ -576,7 +687,7 @@ if st.session_state.page == "home":
         elif filters_to_use["type"] == "Food":
             left_col, right_col = st.columns([1, 2])
             with left_col:
-                st.image(featured["restaurant_img"], use_container_width=True, width=250)
+                show_image(featured["restaurant_img"], alt=featured["restaurant"])
             with right_col:
                 st.markdown(f"### 🏆 {featured['restaurant']}")
                 st.markdown(f"**🎯 Match:** {match_pct}% ")
@@ -588,7 +699,7 @@ if st.session_state.page == "home":
         else:
             left_col, right_col = st.columns([1, 2])
             with left_col:
-                st.image(featured["combo_img"], use_container_width=True, width=250)
+                show_image(featured["combo_img"], alt=f"{featured['activity']} + {featured['restaurant']}")
             with right_col:
                 st.markdown(f"### 🏆 {featured['activity']} + {featured['restaurant']}")
                 st.markdown(f"**🎯 Match:** {match_pct}% ")
@@ -605,7 +716,7 @@ if st.session_state.page == "home":
         with cols[idx]:
             img = plan.get("img")
             if img:
-                st.image(img, use_container_width=True)
+                show_image(img, alt=" + ".join(plan[k] for k in ("activity", "restaurant") if k in plan))
             match_pct = generate_match_percentage(is_featured=False)
             rating_value, rating_stars = generate_rating()
 
@@ -643,6 +754,13 @@ elif st.session_state.page == "checkout":
 
     if st.button("← Back to Search"):
         st.session_state.page = "home"
+        st.session_state.booking_id = None
+        # Go back to the plan this booking was made from, not a fresh one
+        home_plan_id = st.session_state.get("home_plan_id")
+        if home_plan_id:
+            st.query_params.from_dict({"plan": home_plan_id})
+        else:
+            st.query_params.clear()
         st.rerun()
 
     plan = st.session_state.get("selected_plan")
@@ -0,0 +1,86 @@
+import os
+import re
+import sys
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+import static_assets
+
+# Server-side image reads per session, before and after the static asset server.
+# Runs app.py headless with Streamlit's AppTest for a number of home page
+# reruns and counts:
+#   - image bytes st.image reads into Streamlit's media file manager on the
+#     server. These are not bytes on the wire - st.image only sends a
+#     /media/<hash> URL and the browser fetches the file over HTTP.
+#   - bytes of <img> URLs sent in the page instead
+#   - bytes a fresh browser downloads once for the distinct hashed images
+# Usage: python bench_images.py [reruns]
+
+BASE_DIR = Path(__file__).parent
+APP = str(BASE_DIR / "app.py")
+IMAGES_DIR = BASE_DIR / "images"
+
+media_bytes = 0
+_media_add = MediaFileManager.add
+
+
+def _counting_add(self, path_or_data, *args, **kwargs):
+    global media_bytes
+    if isinstance(path_or_data, bytes):
+        media_bytes += len(path_or_data)
+    else:
+        media_bytes += os.path.getsize(path_or_data)
+    return _media_add(self, path_or_data, *args, **kwargs)
+
+
+MediaFileManager.add = _counting_add
+
+
+def run_session(reruns, base_url):
+    """Run one session of `reruns` home page runs.
+    Returns (server-side st.image reads, <img> URL bytes, distinct image bytes)."""
+    global media_bytes
+    media_bytes = 0
+    static_assets.ASSET_BASE_URL = base_url
+    static_assets.ASSET_PORT = 0  # any free port - only the URLs matter here
+    st.cache_resource.clear()
+
+    at = AppTest.from_file(APP, default_timeout=30)
+    url_bytes = 0
+    names = set()
+    for _ in range(reruns):
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        page = " ".join(m.value for m in at.markdown)
+        urls = re.findall(r'<img src="([^"]+)"', page)
+        url_bytes += sum(len(u) for u in urls)
+        names.update(u.rsplit("/", 1)[-1] for u in urls)
+
+    # Hashed names are "<stem>.<hash><suffix>" - size them from the source file
+    download_bytes = 0
+    for name in names:
+        stem, _, suffix = name.split(".")
+        download_bytes += (IMAGES_DIR / f"{stem}.{suffix}").stat().st_size
+    return media_bytes, url_bytes, download_bytes
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    read, _, _ = run_session(reruns, None)
+    print(f"before: {read:,} bytes of server-side image reads via st.image over {reruns} reruns "
+          f"(~{read / reruns / 1024:.0f} KiB per rerun)")
+
+    read, url_bytes, download_bytes = run_session(reruns, "/assets/")
+    print(f"after:  {read:,} bytes of server-side image reads, {url_bytes:,} bytes of <img> URLs "
+          f"over {reruns} reruns; {download_bytes:,} bytes downloaded once per browser, "
+          f"then cached (immutable) or revalidated with a 304")
+    st.cache_resource.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# Server-side plan store for shareable permalinks.
+# Generated plans and bookings are kept once per process, keyed by a hash of
+# their content, so ?plan=<id> (and ?page=checkout&plan=<id>) can be fetched
+# directly instead of re-running the filters and generate_plan. Entries are
+# stored as zlib-compressed JSON, expire after PLAN_TTL_SECONDS and the least
+# recently used are dropped once the store holds PLAN_STORE_MAX entries, so a
+# link friends keep opening outlives a stream of unrelated new plans.
+
+PLAN_TTL_SECONDS = int(os.environ.get("ACTIVITYCITY_PLAN_TTL", str(7 * 24 * 3600)))
+PLAN_STORE_MAX = int(os.environ.get("ACTIVITYCITY_PLAN_STORE_MAX", "1000"))
+
+_plans = OrderedDict()  # plan id -> (expires at, compressed JSON)
+_lock = threading.Lock()
+
+
+def _encode(obj):
+    """Canonical compact JSON. Anything JSON can't represent (dates, times) is
+    stored as its str() and comes back as a string from get() - callers that
+    need the original type must store it explicitly (e.g. isoformat) and
+    parse it back."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def content_id(obj):
+    """Return the short content hash used as a plan ID."""
+    return hashlib.sha256(_encode(obj)).hexdigest()[:16]
+
+
+def _evict(now):
+    # Least recently used entries sit at the front. Stop at the first one still
+    # valid - an expired entry behind it is dropped by get() or the size bound.
+    while _plans and next(iter(_plans.values()))[0] <= now:
+        _plans.popitem(last=False)
+    while len(_plans) > PLAN_STORE_MAX:
+        _plans.popitem(last=False)
+
+
+def put(obj):
+    """Store a plan (any JSON-friendly dict) and return its ID."""
+    data = _encode(obj)
+    plan_id = hashlib.sha256(data).hexdigest()[:16]
+    now = time.monotonic()
+    with _lock:
+        _plans[plan_id] = (now + PLAN_TTL_SECONDS, zlib.compress(data))
+        _plans.move_to_end(plan_id)
+        _evict(now)
+    return plan_id
+
+
+def get(plan_id):
+    """Return the stored plan for an ID, or None if unknown or expired."""
+    if not plan_id:
+        return None
+    with _lock:
+        entry = _plans.get(plan_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _plans[plan_id]
+            return None
+        _plans.move_to_end(plan_id)
+    return json.loads(zlib.decompress(entry[1]))
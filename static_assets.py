@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Static asset server for venue and combo photos.
+# Streamlit re-reads and re-pushes every st.image(path) on each rerun, and its
+# own app/static route only sends weak ETags with no Cache-Control. The images
+# are fixed, so we hash them once per process and serve them from memory under
+# content-hashed names - a rerun then only sends the URL and the browser (or a
+# local reverse proxy) keeps the bytes for a year.
+#
+# The side server is opt-in: the browser has to be able to reach it, which we
+# can't tell from here. Set ACTIVITYCITY_ASSET_URL to the public prefix the
+# browser should use (e.g. "/assets/" with a reverse proxy forwarding to
+# ACTIVITYCITY_ASSET_HOST:ACTIVITYCITY_ASSET_PORT, or "http://localhost:8502/"
+# for local development). Without it the app keeps using st.image.
+#
+# One server per process on a fixed port: every app instance or worker on the
+# same host needs its own ACTIVITYCITY_ASSET_PORT, otherwise the later ones
+# can't bind and fall back to st.image. app.py keeps the server in
+# st.cache_resource so reruns and hot reloads of this module reuse it instead
+# of trying to bind the port again.
+
+ASSET_HOST = os.environ.get("ACTIVITYCITY_ASSET_HOST", "127.0.0.1")
+ASSET_PORT = int(os.environ.get("ACTIVITYCITY_ASSET_PORT", "8502"))
+ASSET_BASE_URL = os.environ.get("ACTIVITYCITY_ASSET_URL")
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+logger = logging.getLogger(__name__)
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    def _send(self, head_only=False):
+        asset = self.server.assets.get(self.path.lstrip("/").split("?", 1)[0])
+        if asset is None:
+            self.send_error(404)
+            return
+        body, etag, content_type = asset
+
+        # Strong ETag - any revalidation of an unchanged file is a bodiless 304.
+        # If-None-Match uses weak comparison (RFC 9110 13.1.2), so W/"..." from
+        # a proxy that weakened the tag (e.g. nginx gzip) and "*" both match.
+        tags = [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]
+        if "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", CACHE_CONTROL)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send()
+
+    def do_HEAD(self):
+        self._send(head_only=True)
+
+    def log_message(self, format, *args):
+        pass  # keep the Streamlit console quiet
+
+
+class AssetServer(ThreadingHTTPServer):
+    """Serves registered images from memory under content-hashed names."""
+    daemon_threads = True
+
+    def __init__(self, address, base_url):
+        super().__init__(address, _AssetHandler)
+        self.base_url = base_url.rstrip("/") + "/"
+        self.assets = {}    # hashed name -> (body, etag, content type)
+        self.urls = {}      # source path -> public URL
+        self._lock = threading.Lock()
+
+    def register(self, paths):
+        """Hash image files and add them to the asset table. Missing files are
+        skipped so the caller's st.image fallback reports them as before."""
+        with self._lock:
+            for p in paths:
+                path = Path(p)
+                if str(p) in self.urls or not path.is_file():
+                    continue
+                body = path.read_bytes()
+                digest = hashlib.sha256(body).hexdigest()
+                name = f"{path.stem}.{digest[:12]}{path.suffix.lower()}"
+                content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                self.assets[name] = (body, f'"{digest}"', content_type)
+                self.urls[str(p)] = self.base_url + name
+
+    def url(self, path):
+        """Return the content-hashed URL for a registered image, or None."""
+        return self.urls.get(str(path))
+
+
+def start_asset_server():
+    """Start the asset server in a daemon thread.
+    Returns None if ACTIVITYCITY_ASSET_URL is unset or the port is taken."""
+    if not ASSET_BASE_URL:
+        return None
+    try:
+        server = AssetServer((ASSET_HOST, ASSET_PORT), ASSET_BASE_URL)
+    except OSError as e:
+        logger.warning("Asset server could not bind %s:%s (%s) - using st.image", ASSET_HOST, ASSET_PORT, e)
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server